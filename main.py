@@ -3,36 +3,102 @@
 Claude Code Extensions Manager - Simple CLI for managing Claude Code extensions
 """
 
+import functools
+import json
 import os
+import re
 import shutil
+import stat
 import sys
 from pathlib import Path
-from typing import Optional, List, Tuple
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, BinaryIO, Optional, List, Tuple, Union
 
-import typer
-import questionary
-from rich import print
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt, Confirm
-from typing import Optional
-from rich.text import Text
+if TYPE_CHECKING:
+    import typer
 
 __version__ = "1.0.0"
 
-app = typer.Typer(
-    name="claude-ext",
-    help="Manage Claude Code extensions",
-    add_completion=False,
-)
-console = Console()
+# Packaged extensions live next to this file and never move at runtime
+_EXTENSIONS_DIR = Path(__file__).parent / "extensions"
 
-# Create subcommands for agent and command
-agent_app = typer.Typer(help="Manage Claude Code agents")
-command_app = typer.Typer(help="Manage Claude Code commands")
+# Typer is only imported once an invocation needs real argument parsing (see
+# cli()), and questionary only once a selector is shown. The agent and command
+# sub-apps are built by _make_ext_cli() and attached by _register_subcommands(),
+# so only the tree being invoked is built.
+EXTENSION_TYPES = ("agent", "command")
 
-app.add_typer(agent_app, name="agent")
-app.add_typer(command_app, name="command")
+# Directory holding each extension type, in the package and under .claude
+_TYPE_DIR = {"agent": "agents", "command": "commands"}
+
+# Key help shown by every multi-select prompt
+_SELECT_INSTRUCTIONS = "↑↓ Navigate | SPACE Select/Deselect | A Select All | ENTER Confirm | Q Quit"
+
+
+# Rich markup tags such as [green] or [/bold cyan]; "[ ]" and "[✓]" are not
+# tags, and neither is an escaped "\[..."
+_MARKUP_TAG = re.compile(r"(?<!\\)\[[a-z#/@][^\[]*?\]")
+
+
+def _write_raw(file, text: str, flush: bool = False) -> None:
+    """Write text to a console's stream as is, bypassing any rendering."""
+    try:
+        file.write(text)
+        if flush:
+            file.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. `| head`); exit quietly like Rich does
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise SystemExit(1)
+
+
+class _PlainConsole:
+    """Console stand-in that writes markup-free text to stdout.
+
+    Used when stdout is not a terminal, where Rich's markup parsing and
+    rendering buy nothing. Anything that is not a plain
+    string (tables) is still handed to Rich.
+    """
+
+    is_terminal = False
+    color_system = None
+
+    def __init__(self):
+        self.file = sys.stdout
+
+    @property
+    def width(self) -> int:
+        return shutil.get_terminal_size().columns
+
+    def print(self, *objects, sep: str = " ", end: str = "\n", **kwargs) -> None:
+        if all(isinstance(obj, str) for obj in objects):
+            text = sep.join(objects)
+            if kwargs.get("markup", True):
+                text = _MARKUP_TAG.sub("", text).replace("\\[", "[")
+            _write_raw(self.file, text + end)
+        else:
+            _rich_console().print(*objects, sep=sep, end=end, **kwargs)
+
+    def clear(self) -> None:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def _rich_console():
+    """Get the shared Rich console, importing Rich on first use."""
+    from rich.console import Console
+
+    # Output is names and paths; Rich's repr highlighter would only add work.
+    # NO_COLOR drops color only; the terminal is still driven as one.
+    return Console(highlight=False, no_color=bool(os.environ.get("NO_COLOR")))
+
+
+@functools.lru_cache(maxsize=None)
+def _console():
+    """Get the console for user-facing output."""
+    if not sys.stdout.isatty():
+        return _PlainConsole()
+    return _rich_console()
 
 
 def get_claude_dir(project_path: Optional[Path] = None) -> Path:
@@ -46,158 +112,350 @@ def get_claude_dir(project_path: Optional[Path] = None) -> Path:
 
 def get_extensions_dir() -> Path:
     """Get the extensions directory in the current package."""
-    return Path(__file__).parent / "extensions"
+    return _EXTENSIONS_DIR
+
+
+# Claude Code names a project's session directory after its path with every
+# non-alphanumeric character replaced by "-"
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+
+
+def _resolve_encoded(base: str, parts: List[str], listings: dict) -> Optional[str]:
+    """Resolve hyphen-split path parts below base to an existing directory.
+
+    Claude Code encodes "/" and every other non-alphanumeric character as
+    "-", so a run of parts may be a single directory name. Each directory is
+    listed once (cached in ``listings``) and the longest run naming a real
+    child wins, backtracking when it leads nowhere. Paths stay plain strings;
+    callers build a Path only for the final match.
+    """
+    if not parts:
+        return base
+
+    children = listings.get(base)
+    if children is None:
+        children = {}
+        try:
+            with os.scandir(base) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        children[_NON_ALNUM.sub("-", entry.name)] = entry.name
+        except OSError:
+            pass
+        listings[base] = children
+
+    for k in range(len(parts), 0, -1):
+        name = children.get("-".join(parts[:k]))
+        if name is not None:
+            found = _resolve_encoded(base + "/" + name, parts[k:], listings)
+            if found is not None:
+                return found
+    return None
+
+
+# Project session dir -> (its st_mtime_ns, cwd read from its sessions)
+_session_cwd_cache = {}
+
+# How much of a session log to search for its cwd; it is recorded on the
+# first entries, and logs can grow to many MB
+_SESSION_HEAD_BYTES = 64 * 1024
+
+
+def _session_cwd(project_dir: os.DirEntry) -> Optional[str]:
+    """Read a project's real path from the ``cwd`` field of its sessions.
+
+    Every session log records the working directory it was started in, which
+    is exactly the path the directory name encodes. Only the start of the
+    newest ``*.jsonl`` file is read, and only a value that encodes back to
+    the directory name is trusted (a session may cd elsewhere later on).
+    None sends the caller to _guess_project_path.
+    """
+    try:
+        mtime = project_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+    cached = _session_cwd_cache.get(project_dir.path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    cwd = None
+    newest = None
+    newest_mtime = -1
+    try:
+        with os.scandir(project_dir.path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jsonl") and entry.is_file():
+                    entry_mtime = entry.stat().st_mtime_ns
+                    if entry_mtime > newest_mtime:
+                        newest, newest_mtime = entry.path, entry_mtime
+        if newest is not None:
+            with open(newest, "rb") as f:
+                head = f.read(_SESSION_HEAD_BYTES)
+            # A line cut off at the end of the head fails to parse and is skipped
+            for line in head.split(b"\n"):
+                if b'"cwd"' not in line:
+                    continue
+                try:
+                    value = json.loads(line).get("cwd")
+                except (ValueError, AttributeError):
+                    continue
+                if isinstance(value, str) and _NON_ALNUM.sub("-", value) == project_dir.name:
+                    cwd = value
+                    break
+    except OSError:
+        pass
+
+    _session_cwd_cache[project_dir.path] = (mtime, cwd)
+    return cwd
+
+
+def _home_base() -> Optional[Tuple[str, int]]:
+    """Return "/Users/<username>" and how many encoded parts it spans.
+
+    The username may itself contain dots, which the encoding turns into
+    extra parts. None if the home directory is too shallow to have one.
+    """
+    home_parts = str(Path.home()).split("/")
+    if len(home_parts) <= 2:
+        return None
+    actual_username = home_parts[2]
+    # Find where the username ends in the parts list
+    username_end_idx = len(actual_username.split(".")) + 1  # +1 for "Users"
+    return "/Users/" + actual_username, username_end_idx
+
+
+def _guess_project_path(
+    encoded_name: str,
+    listings: dict,
+    home_base: Optional[Tuple[str, int]]
+) -> str:
+    """Reconstruct a project path from its encoded directory name alone.
+
+    Used when no session log records the real path. ``home_base`` is the
+    caller's _home_base() result, computed once per scan.
+    """
+    # The directory name format is path components separated by hyphens
+    # e.g., "-Users-chris-cheng-projects-chris-my-awesome-claude-code"
+    # Challenge: both path separators AND hyphens in names become hyphens
+
+    # Remove leading hyphen if present
+    if encoded_name.startswith("-"):
+        encoded_name = encoded_name[1:]
+
+    # Try multiple reconstruction strategies to find the actual path
+    # This is necessary because hyphens in project names are indistinguishable
+    # from path separator hyphens in the encoding
+    parts = encoded_name.split("-")
+
+    # Strategy: We know it starts with Users/username on macOS
+    # Try to find a valid path by testing different combinations
+    if parts[0] == "Users" and len(parts) > 2:
+        if home_base is not None:
+            base_path, username_end_idx = home_base
+
+            # Now we have the remaining parts after the username
+            remaining = parts[username_end_idx:]
+
+            # Match the remaining parts against real directory names
+            found_path = _resolve_encoded(base_path, remaining, listings)
+
+            if found_path:
+                return found_path
+            # Fallback: try the most likely pattern
+            # (projects folder usually comes after username)
+            return "/".join([base_path, *filter(None, remaining)])
+        # Fallback to simple join
+        return "/" + "/".join(parts)
+    # For non-macOS or unrecognized patterns
+    return "/" + "/".join(parts)
+
+
+# Last get_claude_projects() result, keyed on the projects dir and its mtime
+_projects_cache = {"key": None, "value": None}
 
 
 def get_claude_projects() -> List[Tuple[str, Path]]:
     """Get list of available Claude projects.
 
+    The result is cached until ~/.claude/projects changes (its mtime moves
+    whenever Claude Code adds or removes a project entry).
+
     Returns:
         List of tuples containing (friendly_name, full_path)
     """
-    projects_dir = Path.home() / ".claude" / "projects"
-    if not projects_dir.exists():
+    projects_dir = get_claude_dir() / "projects"
+    try:
+        cache_key = (projects_dir, os.stat(projects_dir).st_mtime_ns)
+    except FileNotFoundError:
         return []
+    if _projects_cache["key"] == cache_key:
+        return list(_projects_cache["value"])
 
     projects = []
-    for project_dir in projects_dir.iterdir():
-        if project_dir.is_dir():
-            # The directory name format is path components separated by hyphens
-            # e.g., "-Users-chris-cheng-projects-chris-my-awesome-claude-code"
-            # Challenge: both path separators AND hyphens in names become hyphens
-            encoded_name = project_dir.name
-
-            # Remove leading hyphen if present
-            if encoded_name.startswith("-"):
-                encoded_name = encoded_name[1:]
-
-            # Try multiple reconstruction strategies to find the actual path
-            # This is necessary because hyphens in project names are indistinguishable
-            # from path separator hyphens in the encoding
-            parts = encoded_name.split("-")
-
-            # Strategy: We know it starts with Users/username on macOS
-            # Try to find a valid path by testing different combinations
-            if parts[0] == "Users" and len(parts) > 2:
-                home_path = Path.home()
-                home_parts = str(home_path).split("/")
-
-                if len(home_parts) > 2:
-                    actual_username = home_parts[2]
-                    username_dot_parts = actual_username.split(".")
-
-                    # Find where the username ends in the parts list
-                    username_end_idx = len(username_dot_parts) + 1  # +1 for "Users"
-
-                    # Start with base path
-                    base_path = Path("/Users") / actual_username
-
-                    # Now we have the remaining parts after the username
-                    remaining = parts[username_end_idx:]
-
-                    # Try to find valid paths by testing different combinations
-                    # Start from the end and work backwards, joining with hyphens
-                    found_path = None
-
-                    # Try different split points to handle hyphenated directory names
-                    for i in range(len(remaining), 0, -1):
-                        # Try treating the last i parts as a single hyphenated name
-                        if i == len(remaining):
-                            # All parts separate
-                            test_path = base_path
-                            for part in remaining:
-                                if part:  # Skip empty parts
-                                    test_path = test_path / part
-                        else:
-                            # Join the last (len(remaining) - i + 1) parts with hyphens
-                            test_path = base_path
-                            # Add the first parts as separate directories
-                            for j in range(i - 1):
-                                if remaining[j]:
-                                    test_path = test_path / remaining[j]
-                            # Join the remaining parts with hyphens as a single directory
-                            if i - 1 < len(remaining):
-                                hyphenated = "-".join(remaining[i-1:])
-                                if hyphenated:
-                                    test_path = test_path / hyphenated
-
-                        if test_path.exists() and test_path.is_dir():
-                            found_path = test_path
-                            break
-
-                    if found_path:
-                        actual_path = found_path
-                    else:
-                        # Fallback: try the most likely pattern
-                        # (projects folder usually comes after username)
-                        actual_path = base_path
-                        for part in remaining:
-                            if part:
-                                actual_path = actual_path / part
-                else:
-                    # Fallback to simple join
-                    actual_path = Path("/" + "/".join(parts))
-            else:
-                # For non-macOS or unrecognized patterns
-                actual_path = Path("/" + "/".join(parts))
-
-            # Only add if the path exists
-            if actual_path.exists() and actual_path.is_dir():
-                # Get a friendly project name from the last few meaningful parts
-                path_str = str(actual_path)
-                path_parts = path_str.split("/")
-
-                # Find the project name - usually the last component or last few
-                if "projects" in path_parts:
-                    idx = path_parts.index("projects")
-                    if idx < len(path_parts) - 1:
+    listings = {}  # directory -> child names, shared across projects
+    # Parse HOME once per scan, not per project (and not per process: HOME may change)
+    home_base = _home_base()
+    seen = set()  # (st_dev, st_ino) of directories already listed
+    # DirEntry.is_dir() answers from the readdir data
+    with os.scandir(projects_dir) as entries:
+        for project_dir in entries:
+            if project_dir.is_dir():
+                # Prefer the path recorded by Claude Code itself; decoding the
+                # directory name is ambiguous and costs a listing per level
+                actual_path = _session_cwd(project_dir) or _guess_project_path(
+                    project_dir.name, listings, home_base
+                )
+
+                # Only add if the path exists, and only once per real directory
+                # (symlinked or differently encoded entries can resolve to it twice)
+                try:
+                    st = os.stat(actual_path)
+                except OSError:
+                    continue
+                dir_id = (st.st_dev, st.st_ino)
+                if stat.S_ISDIR(st.st_mode) and dir_id not in seen:
+                    seen.add(dir_id)
+                    # Get a friendly project name from the last few meaningful parts
+                    path_parts = actual_path.split("/")
+
+                    # Find the project name - usually the last component or last few
+                    try:
+                        idx = path_parts.index("projects")
+                    except ValueError:
+                        idx = -1
+                    if 0 <= idx < len(path_parts) - 1:
                         # Get everything after "projects" as the project identifier
-                        project_parts = path_parts[idx+1:]
-                        project_name = "/".join(project_parts)
+                        project_name = "/".join(path_parts[idx+1:])
                     else:
-                        project_name = path_parts[-1] if path_parts else "unknown"
-                else:
-                    project_name = path_parts[-1] if path_parts else "unknown"
+                        project_name = path_parts[-1]
 
-                projects.append((project_name, actual_path))
+                    projects.append((project_name, Path(actual_path)))
 
-    return sorted(projects, key=lambda x: x[0].lower())
+    projects.sort(key=lambda x: x[0].lower())
+    _projects_cache["key"] = cache_key
+    _projects_cache["value"] = projects
+    return list(projects)
 
 
-def list_available(ext_type: str):
-    """List available extensions of given type."""
+def _scan_available(ext_type: str) -> List[str]:
+    """List available extensions by reading the packaged directory."""
     extensions_dir = get_extensions_dir()
-    type_dir = extensions_dir / f"{ext_type}s"
-
-    if not type_dir.exists():
-        return []
+    type_dir = extensions_dir / _TYPE_DIR[ext_type]
 
     results = []
-    for item in type_dir.iterdir():
-        if item.is_file() and item.suffix == '.md':
-            # Remove .md extension from name
-            results.append(item.stem)
+    try:
+        with os.scandir(type_dir) as entries:
+            for entry in entries:
+                # Follow symlinks, as install does when it opens the source;
+                # only a symlink costs a stat, other entries answer from the
+                # readdir data
+                if entry.name.endswith(".md") and entry.is_file():
+                    # Remove .md extension from name
+                    results.append(entry.name[:-3])
+    except FileNotFoundError:
+        return []
 
     return results
 
 
+# Session cache for list_installed(); entries are dropped on every
+# install/uninstall.
+_installed_cache = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _available_names(ext_type: str) -> Tuple[str, ...]:
+    """Return the available extension names of given type, sorted by name.
+
+    Packaged extensions never change at runtime, so the directory is scanned
+    once per type.
+    """
+    return tuple(sorted(_scan_available(ext_type), key=str.lower))
+
+
+def list_available(ext_type: str):
+    """List available extensions of given type, sorted by name."""
+    return list(_available_names(ext_type))
+
+
 def list_installed(ext_type: str, project_path: Optional[Path] = None):
     """List installed extensions of given type."""
-    claude_dir = get_claude_dir(project_path)
-    type_dir = claude_dir / f"{ext_type}s"
+    key = (ext_type, str(project_path))
+    if key not in _installed_cache:
+        _installed_cache[key] = _scan_installed(ext_type, project_path)
+    return list(_installed_cache[key])
 
-    if not type_dir.exists():
-        return []
+
+def _scan_installed(ext_type: str, project_path: Optional[Path] = None):
+    """List installed extensions by reading the target directory."""
+    claude_dir = get_claude_dir(project_path)
+    type_dir = claude_dir / _TYPE_DIR[ext_type]
 
     results = []
-    for item in type_dir.iterdir():
-        if item.is_file() and item.suffix == '.md':
-            # Remove .md extension from name
-            results.append((item.stem, str(item)))
+    try:
+        with os.scandir(type_dir) as entries:
+            for entry in entries:
+                # Users often symlink extensions into .claude, so follow links
+                # here; only a symlink costs a stat, other entries answer
+                # from the readdir data
+                if entry.name.endswith(".md") and entry.is_file():
+                    # Remove .md extension from name
+                    results.append((entry.name[:-3], entry.path))
+    except FileNotFoundError:
+        return []
 
     return results
 
 
+def _copy_extension(
+    src: BinaryIO,
+    target_file: Union[str, Path],
+    dir_fd: Optional[int] = None,
+    exclusive: bool = False
+) -> None:
+    """Copy an already opened extension file into place.
+
+    Callers open the source themselves so that the open doubles as the
+    existence check. A hardlink would be cheaper still, but editing the
+    installed file would then edit the packaged one. copy_file_range()
+    instead reflinks on CoW filesystems (btrfs, XFS) and copies in-kernel
+    elsewhere; platforms or filesystems without it fall back to a plain
+    buffered copy.
+
+    With ``dir_fd``, ``target_file`` is relative to that open directory, so
+    batch installs do not resolve the full target path again for every file.
+    The source's timestamps are carried over, as shutil.copy2 used to do.
+    With ``exclusive``, an existing target raises FileExistsError untouched.
+    """
+    st = os.fstat(src.fileno())
+    opener = None
+    if dir_fd is not None:
+        opener = functools.partial(os.open, mode=0o666, dir_fd=dir_fd)
+    with open(target_file, "xb" if exclusive else "wb", opener=opener) as dst:
+        copied = False
+        copy_file_range = getattr(os, "copy_file_range", None)
+        if copy_file_range is not None:
+            try:
+                remaining = st.st_size
+                while remaining > 0:
+                    n = copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+                copied = True
+            except OSError:
+                # Start over from the top of both files
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+
+        if not copied:
+            shutil.copyfileobj(src, dst)
+
+    # Set after close so no buffered write can bump the mtime again
+    os.utime(target_file, ns=(st.st_atime_ns, st.st_mtime_ns), dir_fd=dir_fd)
+
+
 def install_extension(
     ext_type: str,
     name: str,
@@ -205,34 +463,45 @@ def install_extension(
     force: bool = False
 ):
     """Install an extension."""
-    # Source path - look for .md file
-    extensions_dir = get_extensions_dir()
-    source_file = extensions_dir / f"{ext_type}s" / f"{name}.md"
+    import typer
 
-    if not source_file.exists():
-        console.print(f"[red]❌ {ext_type.capitalize()} '{name}' not found[/red]")
-        console.print(f"[dim]Run 'claude-ext {ext_type} list' to see available {ext_type}s[/dim]")
-        raise typer.Exit(1)
+    # Plain string paths: nothing here needs a Path object
+    type_dir = _TYPE_DIR[ext_type]
+    file_name = f"{name}.md"
 
-    # Target path - also .md file
-    claude_dir = get_claude_dir(project_path)
-    target_file = claude_dir / f"{ext_type}s" / f"{name}.md"
+    # Source path - look for .md file; opening it is the existence check
+    source_file = os.path.join(get_extensions_dir(), type_dir, file_name)
 
-    # Check if already exists
-    if target_file.exists() and not force:
-        console.print(f"[yellow]⚠️  {ext_type.capitalize()} '{name}' already installed[/yellow]")
-        console.print("[dim]Use --force to overwrite[/dim]")
+    try:
+        src = open(source_file, "rb")
+    except FileNotFoundError:
+        _console().print(f"[red]❌ {ext_type.capitalize()} '{name}' not found[/red]")
+        _console().print(f"[dim]Run 'claude-ext {ext_type} list' to see available {ext_type}s[/dim]")
         raise typer.Exit(1)
 
-    # Create directory structure
-    target_file.parent.mkdir(parents=True, exist_ok=True)
+    with src:
+        # Target path - also .md file
+        target_dir = os.path.join(get_claude_dir(project_path), type_dir)
+        target_file = os.path.join(target_dir, file_name)
 
-    # Copy file
-    shutil.copy2(source_file, target_file)
+        # Create directory structure
+        os.makedirs(target_dir, exist_ok=True)
+
+        # Copy file; without --force the target is created exclusively, so
+        # the open itself reports an existing install (no separate stat, and
+        # no window between checking and writing)
+        try:
+            _copy_extension(src, target_file, exclusive=not force)
+        except FileExistsError:
+            _console().print(f"[yellow]⚠️  {ext_type.capitalize()} '{name}' already installed[/yellow]")
+            _console().print("[dim]Use --force to overwrite[/dim]")
+            raise typer.Exit(1)
+
+    _installed_cache.clear()
 
     level = "project" if project_path else "user"
-    console.print(f"[green]✅ Installed {ext_type} '{name}' to {level} level[/green]")
-    console.print(f"[dim]📍 Location: {target_file}[/dim]")
+    _console().print(f"[green]✅ Installed {ext_type} '{name}' to {level} level[/green]")
+    _console().print(f"[dim]📍 Location: {target_file}[/dim]")
 
 
 def uninstall_extension(
@@ -241,235 +510,261 @@ def uninstall_extension(
     project_path: Optional[Path] = None
 ):
     """Uninstall an extension."""
-    claude_dir = get_claude_dir(project_path)
-    target_file = claude_dir / f"{ext_type}s" / f"{name}.md"
+    import typer
+
+    target_file = os.path.join(get_claude_dir(project_path), _TYPE_DIR[ext_type], f"{name}.md")
 
-    if not target_file.exists():
+    try:
+        os.unlink(target_file)  # Remove the .md file
+    except FileNotFoundError:
         level = "project" if project_path else "user"
-        console.print(f"[red]❌ {ext_type.capitalize()} '{name}' not found at {level} level[/red]")
+        _console().print(f"[red]❌ {ext_type.capitalize()} '{name}' not found at {level} level[/red]")
         raise typer.Exit(1)
 
-    target_file.unlink()  # Remove the .md file
-    console.print(f"[green]✅ Uninstalled {ext_type} '{name}'[/green]")
-
+    _installed_cache.clear()
+    _console().print(f"[green]✅ Uninstalled {ext_type} '{name}'[/green]")
 
-# Agent commands
-@agent_app.command("list")
-def agent_list(
-    installed: bool = typer.Option(False, "--installed", "-i", help="Show installed agents"),
-    project: Optional[Path] = typer.Option(None, "--project", "-p", help="Project path"),
-):
-    """List available or installed agents."""
 
-    if installed:
-        agents = list_installed("agent", project)
-        if not agents:
-            level = "project" if project else "user"
-            console.print(f"[yellow]No agents installed at {level} level[/yellow]")
-            return
+# Longer listings skip rich.table and print one plain line per row
+_TABLE_MAX_ROWS = 200
 
-        table = Table(title=f"Installed Agents ({'project' if project else 'user'} level)")
-        table.add_column("Name", style="green")
-        table.add_column("Location", style="dim")
 
-        for name, location in agents:
-            table.add_row(name, location)
+@functools.lru_cache(maxsize=None)
+def _shared_options() -> SimpleNamespace:
+    """Build the options that read the same for agents and commands, once.
 
-        console.print(table)
-    else:
-        agents = list_available("agent")
-        if not agents:
-            console.print("[yellow]No agents available[/yellow]")
-            return
+    Every sub-app _make_ext_cli() creates shares these OptionInfo objects.
+    """
+    import typer
+
+    return SimpleNamespace(
+        project=typer.Option(None, "--project", "-p", help="Project path"),
+        install_project=typer.Option(None, "--project", "-p", help="Project path (if not specified, installs to user level)"),
+        uninstall_project=typer.Option(None, "--project", "-p", help="Project path (if not specified, uninstalls from user level)"),
+        force=typer.Option(False, "--force", "-f", help="Overwrite if exists"),
+        interactive=typer.Option(False, "--interactive", "-i", help="Interactive multi-select mode"),
+    )
 
-        table = Table(title="Available Agents")
-        table.add_column("Name", style="green")
 
-        for name in sorted(agents):
-            table.add_row(name)
+def _make_ext_cli(ext_type: str) -> "typer.Typer":
+    """Build the list/install/uninstall sub-app for one extension type.
 
-        console.print(table)
-        console.print("\n[dim]Install with: claude-ext agent install <name>[/dim]")
+    Agents and commands share every handler; only the type name and the
+    wording of the help text differ.
+    """
+    import typer
+
+    opts = _shared_options()
+    plural = f"{ext_type}s"
+    title = plural.capitalize()
+    ext_app = typer.Typer(help=f"Manage Claude Code {plural}")
+
+    @ext_app.command("list", help=f"List available or installed {plural}.")
+    def ext_list(
+        installed: bool = typer.Option(False, "--installed", "-i", help=f"Show installed {plural}"),
+        project: Optional[Path] = opts.project,
+    ):
+        from rich.table import Table
+        from rich.text import Text
+
+        if installed:
+            extensions = list_installed(ext_type, project)
+            if not extensions:
+                level = "project" if project else "user"
+                _console().print(f"[yellow]No {plural} installed at {level} level[/yellow]")
+                return
+
+            table_title = f"Installed {title} ({'project' if project else 'user'} level)"
+            if len(extensions) > _TABLE_MAX_ROWS:
+                # Rich measures every cell to lay out a table, which dominates
+                # at this size; write tab-separated rows straight to the stream
+                # instead (Rich would expand the tabs and wrap long paths)
+                console = _console()
+                console.print(f"[bold]{table_title}[/bold]")
+                _write_raw(
+                    console.file,
+                    "".join(f"{name}\t{location}\n" for name, location in extensions),
+                    flush=True,
+                )
+                return
 
+            table = Table(title=table_title)
+            table.add_column("Name", style="green")
+            table.add_column("Location", style="dim")
 
-@agent_app.command("install")
-def agent_install(
-    names: List[str] = typer.Argument(None, help="Agent name(s) to install (space-separated for multiple)"),
-    project: Optional[Path] = typer.Option(None, "--project", "-p", help="Project path (if not specified, installs to user level)"),
-    force: bool = typer.Option(False, "--force", "-f", help="Overwrite if exists"),
-    interactive: bool = typer.Option(False, "--interactive", "-i", help="Interactive multi-select mode"),
-):
-    """Install Claude Code agents."""
-    if interactive or not names:
-        # Interactive mode
-        extensions = list_available("agent")
-        if not extensions:
-            console.print("[yellow]No agents available to install[/yellow]")
-            raise typer.Exit()
+            for name, location in extensions:
+                table.add_row(Text(name), Text(location))
 
-        selected = multi_select(
-            sorted(extensions),
-            title="Select agents to install",
-            instructions="↑↓ Navigate | SPACE Select/Deselect | A Select All | ENTER Confirm | Q Quit"
-        )
+            _console().print(table)
+        else:
+            names = _available_names(ext_type)
+            if not names:
+                _console().print(f"[yellow]No {plural} available[/yellow]")
+                return
+
+            table = Table(title=f"Available {title}")
+            table.add_column("Name", style="green")
+
+            for name in names:
+                table.add_row(Text(name))
+
+            _console().print(table)
+            _console().print(f"\n[dim]Install with: claude-ext {ext_type} install <name>[/dim]")
+
+    @ext_app.command("install", help=f"Install Claude Code {plural}.")
+    def ext_install(
+        names: List[str] = typer.Argument(None, help=f"{ext_type.capitalize()} name(s) to install (space-separated for multiple)"),
+        project: Optional[Path] = opts.install_project,
+        force: bool = opts.force,
+        interactive: bool = opts.interactive,
+    ):
+        if interactive or not names:
+            # Interactive mode
+            extensions = list_available(ext_type)
+            if not extensions:
+                _console().print(f"[yellow]No {plural} available to install[/yellow]")
+                raise typer.Exit()
 
-        if not selected:
-            console.print("[yellow]No agents selected[/yellow]")
-            raise typer.Exit()
+            selected = multi_select(
+                extensions,
+                title=f"Select {plural} to install",
+                instructions=_SELECT_INSTRUCTIONS
+            )
 
-        successful, failed = install_multiple_extensions("agent", selected, project, force)
+            if not selected:
+                _console().print(f"[yellow]No {plural} selected[/yellow]")
+                raise typer.Exit()
 
-        # Summary
-        if successful:
-            console.print(f"\n[green]✅ Successfully installed {len(successful)} agent(s)[/green]")
-        if failed:
-            console.print(f"[red]❌ Failed to install {len(failed)} agent(s)[/red]")
+            successful, failed = install_multiple_extensions(ext_type, selected, project, force)
 
-    elif len(names) == 1:
-        # Single installation
-        install_extension("agent", names[0], project, force)
+        elif len(names) == 1:
+            # Single installation
+            install_extension(ext_type, names[0], project, force)
+            return
 
-    else:
-        # Multiple installation
-        successful, failed = install_multiple_extensions("agent", names, project, force)
+        else:
+            # Multiple installation
+            successful, failed = install_multiple_extensions(ext_type, names, project, force)
 
         # Summary
         if successful:
-            console.print(f"\n[green]✅ Successfully installed {len(successful)} agent(s)[/green]")
+            _console().print(f"\n[green]✅ Successfully installed {len(successful)} {ext_type}(s)[/green]")
         if failed:
-            console.print(f"[red]❌ Failed to install {len(failed)} agent(s)[/red]")
+            _console().print(f"[red]❌ Failed to install {len(failed)} {ext_type}(s)[/red]")
 
+    @ext_app.command("uninstall", help=f"Uninstall a Claude Code {ext_type}.")
+    def ext_uninstall(
+        name: str = typer.Argument(..., help=f"{ext_type.capitalize()} name to uninstall"),
+        project: Optional[Path] = opts.uninstall_project,
+    ):
+        uninstall_extension(ext_type, name, project)
 
-@agent_app.command("uninstall")
-def agent_uninstall(
-    name: str = typer.Argument(..., help="Agent name to uninstall"),
-    project: Optional[Path] = typer.Option(None, "--project", "-p", help="Project path (if not specified, uninstalls from user level)"),
-):
-    """Uninstall a Claude Code agent."""
-    uninstall_extension("agent", name, project)
+    return ext_app
 
 
-# Command commands
-@command_app.command("list")
-def command_list(
-    installed: bool = typer.Option(False, "--installed", "-i", help="Show installed commands"),
-    project: Optional[Path] = typer.Option(None, "--project", "-p", help="Project path"),
-):
-    """List available or installed commands."""
+def list_projects():
+    """List available Claude projects."""
+    from rich.table import Table
+    from rich.text import Text
 
-    if installed:
-        commands = list_installed("command", project)
-        if not commands:
-            level = "project" if project else "user"
-            console.print(f"[yellow]No commands installed at {level} level[/yellow]")
-            return
+    projects = get_claude_projects()
 
-        table = Table(title=f"Installed Commands ({'project' if project else 'user'} level)")
-        table.add_column("Name", style="green")
-        table.add_column("Location", style="dim")
+    if not projects:
+        _console().print("[yellow]No Claude projects found[/yellow]")
+        _console().print("[dim]Projects are created when you use Claude Code in a directory[/dim]")
+        return
 
-        for name, location in commands:
-            table.add_row(name, location)
+    table = Table(title="Available Claude Projects")
+    table.add_column("Project Name", style="green")
+    table.add_column("Path", style="dim")
 
-        console.print(table)
-    else:
-        commands = list_available("command")
-        if not commands:
-            console.print("[yellow]No commands available[/yellow]")
-            return
+    for name, path in projects:
+        table.add_row(Text(name), Text(str(path)))
 
-        table = Table(title="Available Commands")
-        table.add_column("Name", style="green")
+    _console().print(table)
+    _console().print("\n[dim]Use --project <path> to install to a specific project[/dim]")
 
-        for name in sorted(commands):
-            table.add_row(name)
 
-        console.print(table)
-        console.print("\n[dim]Install with: claude-ext command install <name>[/dim]")
+def interactive():
+    """Interactive mode for managing extensions"""
+    project_cache = {}  # project menu, built on first use and kept for the session
+    while _interactive_once(project_cache):
+        pass
 
 
-@command_app.command("install")
-def command_install(
-    names: List[str] = typer.Argument(None, help="Command name(s) to install (space-separated for multiple)"),
-    project: Optional[Path] = typer.Option(None, "--project", "-p", help="Project path (if not specified, installs to user level)"),
-    force: bool = typer.Option(False, "--force", "-f", help="Overwrite if exists"),
-    interactive: bool = typer.Option(False, "--interactive", "-i", help="Interactive multi-select mode"),
-):
-    """Install Claude Code commands."""
-    if interactive or not names:
-        # Interactive mode
-        extensions = list_available("command")
-        if not extensions:
-            console.print("[yellow]No commands available to install[/yellow]")
-            raise typer.Exit()
+# Marks Claude project entries in the project menu
+_PROJ_PREFIX = "  📁 "
 
-        selected = multi_select(
-            sorted(extensions),
-            title="Select commands to install",
-            instructions="↑↓ Navigate | SPACE Select/Deselect | A Select All | ENTER Confirm | Q Quit"
-        )
+# Headings in the project menu; picking one cancels
+_PROJ_HEADING = "--- Claude Projects ---"
+_OTHER_HEADING = "--- Other Locations ---"
+_SEPARATORS = frozenset((_PROJ_HEADING, _OTHER_HEADING))
 
-        if not selected:
-            console.print("[yellow]No commands selected[/yellow]")
-            raise typer.Exit()
+# Relative locations offered by the project menu
+_CWD = Path(".")
+_PARENT = Path("..")
 
-        successful, failed = install_multiple_extensions("command", selected, project, force)
 
-        # Summary
-        if successful:
-            console.print(f"\n[green]✅ Successfully installed {len(successful)} command(s)[/green]")
-        if failed:
-            console.print(f"[red]❌ Failed to install {len(failed)} command(s)[/red]")
+def _prompt_project_location(cache: dict, cancel_message: str) -> Path:
+    """Ask which project to use; picking a separator cancels the operation.
 
-    elif len(names) == 1:
-        # Single installation
-        install_extension("command", names[0], project, force)
+    The menu entries and the label -> path map are built on first use and
+    kept in ``cache`` for the rest of the interactive session, so a choice is
+    resolved by lookup rather than by parsing the label.
+    """
+    import typer
+    from rich.prompt import Prompt
+
+    if not cache:
+        # Get available Claude projects
+        claude_projects = get_claude_projects()
+
+        # Build project choices
+        project_choices = []
+        label_to_path = {}
+        if claude_projects:
+            project_choices.append(_PROJ_HEADING)
+            for name, path in claude_projects:
+                label = f"{_PROJ_PREFIX}{name}"
+                project_choices.append(label)
+                label_to_path[label] = path
+            project_choices.append(_OTHER_HEADING)
+
+        project_choices.extend([
+            "current directory (.)",
+            "parent directory (..)",
+            "enter custom path"
+        ])
+        label_to_path["current directory (.)"] = _CWD
+        label_to_path["parent directory (..)"] = _PARENT
+
+        cache["choices"] = project_choices
+        cache["default_index"] = 0 if not claude_projects else len(claude_projects) + 2
+        cache["label_to_path"] = label_to_path
+
+    project_choice = single_select(
+        cache["choices"],
+        title="Select project location",
+        default_index=cache["default_index"]
+    )
 
+    # Claude projects and the fixed locations resolve straight to a path
+    project = cache["label_to_path"].get(project_choice)
+    if project is not None:
+        return project
+    elif project_choice in _SEPARATORS:
+        # User selected a separator, treat as cancelled
+        _console().print(f"[yellow]{cancel_message}[/yellow]")
+        raise typer.Exit()
     else:
-        # Multiple installation
-        successful, failed = install_multiple_extensions("command", names, project, force)
-
-        # Summary
-        if successful:
-            console.print(f"\n[green]✅ Successfully installed {len(successful)} command(s)[/green]")
-        if failed:
-            console.print(f"[red]❌ Failed to install {len(failed)} command(s)[/red]")
-
-
-@command_app.command("uninstall")
-def command_uninstall(
-    name: str = typer.Argument(..., help="Command name to uninstall"),
-    project: Optional[Path] = typer.Option(None, "--project", "-p", help="Project path (if not specified, uninstalls from user level)"),
-):
-    """Uninstall a Claude Code command."""
-    uninstall_extension("command", name, project)
-
-
-@app.command()
-def list_projects():
-    """List available Claude projects."""
-    projects = get_claude_projects()
-
-    if not projects:
-        console.print("[yellow]No Claude projects found[/yellow]")
-        console.print("[dim]Projects are created when you use Claude Code in a directory[/dim]")
-        return
-
-    table = Table(title="Available Claude Projects")
-    table.add_column("Project Name", style="green")
-    table.add_column("Path", style="dim")
+        return Path(Prompt.ask("Enter project path", default="."))
 
-    for name, path in projects:
-        table.add_row(name, str(path))
 
-    console.print(table)
-    console.print("\n[dim]Use --project <path> to install to a specific project[/dim]")
+def _interactive_once(project_cache: dict) -> bool:
+    """Run one interactive operation; return True if the user wants another"""
+    import typer
 
-
-@app.command()
-def interactive():
-    """Interactive mode for managing extensions"""
-    console.print("[bold cyan]Claude Code Extensions Manager - Interactive Mode[/bold cyan]\n")
+    _console().print("[bold cyan]Claude Code Extensions Manager - Interactive Mode[/bold cyan]\n")
 
     # Choose extension type using select
     ext_type = single_select(
@@ -479,7 +774,7 @@ def interactive():
     )
 
     if ext_type == "quit":
-        console.print("[yellow]Goodbye![/yellow]")
+        _console().print("[yellow]Goodbye![/yellow]")
         raise typer.Exit()
 
     # Choose action using select
@@ -490,7 +785,7 @@ def interactive():
     )
 
     if action == "quit":
-        console.print("[yellow]Goodbye![/yellow]")
+        _console().print("[yellow]Goodbye![/yellow]")
         raise typer.Exit()
 
     # Execute action
@@ -503,13 +798,15 @@ def interactive():
         )
 
         if list_type == "available":
-            extensions = list_available(ext_type)
-            if not extensions:
-                console.print(f"[yellow]No {ext_type}s available[/yellow]")
+            names = _available_names(ext_type)
+            if not names:
+                _console().print(f"[yellow]No {ext_type}s available[/yellow]")
             else:
-                console.print(f"\n[bold]Available {ext_type.capitalize()}s:[/bold]")
-                for i, name in enumerate(sorted(extensions), 1):
-                    console.print(f"  {i}. [green]{name}[/green]")
+                _console().print(f"\n[bold]Available {ext_type.capitalize()}s:[/bold]")
+                _console().print("\n".join(
+                    f"  {i}. [green]{name}[/green]"
+                    for i, name in enumerate(names, 1)
+                ))
         else:
             # Ask for level using select
             level = single_select(
@@ -520,67 +817,23 @@ def interactive():
             if level == "user-level (~/.claude)":
                 project = None
             else:
-                # Get available Claude projects
-                claude_projects = get_claude_projects()
-
-                # Build project choices
-                project_choices = []
-                if claude_projects:
-                    project_choices.append("--- Claude Projects ---")
-                    for name, _ in claude_projects:
-                        project_choices.append(f"  📁 {name}")
-                    project_choices.append("--- Other Locations ---")
-
-                project_choices.extend([
-                    "current directory (.)",
-                    "parent directory (..)",
-                    "enter custom path"
-                ])
-
-                project_choice = single_select(
-                    project_choices,
-                    title="Select project location",
-                    default_index=0 if not claude_projects else len(claude_projects) + 2
-                )
-
-                # Parse the selection
-                project = None  # Initialize to avoid UnboundLocalError
-                if project_choice.startswith("  📁 "):
-                    # It's a Claude project
-                    selected_name = project_choice[5:]  # Remove "  📁 " prefix
-                    # Find the matching project
-                    for name, path in claude_projects:
-                        if name == selected_name:
-                            project = path
-                            break
-                    if project is None:
-                        console.print(f"[red]Error: Could not find project '{selected_name}'[/red]")
-                        raise typer.Exit()
-                elif project_choice == "current directory (.)":
-                    project = Path(".")
-                elif project_choice == "parent directory (..)":
-                    project = Path("..")
-                elif project_choice in ["--- Claude Projects ---", "--- Other Locations ---"]:
-                    # User selected a separator, treat as cancelled
-                    console.print("[yellow]Operation cancelled[/yellow]")
-                    raise typer.Exit()
-                else:
-                    project = Path(Prompt.ask("Enter project path", default="."))
+                project = _prompt_project_location(project_cache, "Operation cancelled")
 
             installed = list_installed(ext_type, project)
             if not installed:
                 level = "user" if project is None else "project"
-                console.print(f"[yellow]No {ext_type}s installed at {level} level[/yellow]")
+                _console().print(f"[yellow]No {ext_type}s installed at {level} level[/yellow]")
             else:
-                console.print(f"\n[bold]Installed {ext_type.capitalize()}s:[/bold]")
-                for name, location in installed:
-                    console.print(f"  • [green]{name}[/green] ({location})")
+                _console().print(f"\n[bold]Installed {ext_type.capitalize()}s:[/bold]")
+                _console().print("\n".join(
+                    f"  • [green]{name}[/green] ({location})" for name, location in installed
+                ))
 
     elif action == "install":
         # Show available extensions
         extensions = list_available(ext_type)
         if not extensions:
-            console.print(f"[yellow]No {ext_type}s available to install[/yellow]")
+            _console().print(f"[yellow]No {ext_type}s available to install[/yellow]")
             raise typer.Exit()
 
         # Ask for selection mode using select
@@ -594,19 +847,18 @@ def interactive():
         if mode == "multiple":
             # Multi-select mode
             selected_items = multi_select(
-                sorted(extensions),
+                extensions,
                 title=f"Select {ext_type}s to install (SPACE to select, ENTER to confirm)",
-                instructions="↑↓ Navigate | SPACE Select/Deselect | A Select All | ENTER Confirm | Q Quit"
+                instructions=_SELECT_INSTRUCTIONS
             )
 
             if not selected_items:
-                console.print("[yellow]No items selected[/yellow]")
+                _console().print("[yellow]No items selected[/yellow]")
                 raise typer.Exit()
 
             # Choose installation level
-            console.print(f"\n[cyan]Selected {len(selected_items)} {ext_type}(s) for installation[/cyan]")
-            for item in selected_items:
-                console.print(f"  • {item}")
+            _console().print(f"\n[cyan]Selected {len(selected_items)} {ext_type}(s) for installation[/cyan]")
+            _console().print("\n".join(f"  • {item}" for item in selected_items))
 
             # Choose installation level using select
             level = single_select(
@@ -616,56 +868,10 @@ def interactive():
             )
             if level == "user-level (~/.claude)":
                 project = None
-                console.print("[dim]Installing to user level (~/.claude)[/dim]")
+                _console().print("[dim]Installing to user level (~/.claude)[/dim]")
             else:
-                # Get available Claude projects
-                claude_projects = get_claude_projects()
-
-                # Build project choices
-                project_choices = []
-                if claude_projects:
-                    project_choices.append("--- Claude Projects ---")
-                    for name, _ in claude_projects:
-                        project_choices.append(f"  📁 {name}")
-                    project_choices.append("--- Other Locations ---")
-
-                project_choices.extend([
-                    "current directory (.)",
-                    "parent directory (..)",
-                    "enter custom path"
-                ])
-
-                project_choice = single_select(
-                    project_choices,
-                    title="Select project location",
-                    default_index=0 if not claude_projects else len(claude_projects) + 2
-                )
-
-                # Parse the selection
-                project = None  # Initialize to avoid UnboundLocalError
-                if project_choice.startswith("  📁 "):
-                    # It's a Claude project
-                    selected_name = project_choice[5:]  # Remove "  📁 " prefix
-                    # Find the matching project
-                    for name, path in claude_projects:
-                        if name == selected_name:
-                            project = path
-                            break
-                    if project is None:
-                        console.print(f"[red]Error: Could not find project '{selected_name}'[/red]")
-                        raise typer.Exit()
-                elif project_choice == "current directory (.)":
-                    project = Path(".")
-                elif project_choice == "parent directory (..)":
-                    project = Path("..")
-                elif project_choice in ["--- Claude Projects ---", "--- Other Locations ---"]:
-                    # User selected a separator, treat as cancelled
-                    console.print("[yellow]Installation cancelled[/yellow]")
-                    raise typer.Exit()
-                else:
-                    project = Path(Prompt.ask("Enter project path", default="."))
-
-                console.print(f"[dim]Installing to project: {project}[/dim]")
+                project = _prompt_project_location(project_cache, "Installation cancelled")
+                _console().print(f"[dim]Installing to project: {project}[/dim]")
 
             # Confirm using select
             confirm = single_select(
@@ -677,23 +883,23 @@ def interactive():
                 successful, failed = install_multiple_extensions(ext_type, selected_items, project)
 
                 # Summary
-                console.print(f"\n[bold]Installation Summary:[/bold]")
+                _console().print(f"\n[bold]Installation Summary:[/bold]")
                 if successful:
-                    console.print(f"[green]✅ Successfully installed: {len(successful)} {ext_type}(s)[/green]")
+                    _console().print(f"[green]✅ Successfully installed: {len(successful)} {ext_type}(s)[/green]")
                 if failed:
-                    console.print(f"[red]❌ Failed: {len(failed)} {ext_type}(s)[/red]")
+                    _console().print(f"[red]❌ Failed: {len(failed)} {ext_type}(s)[/red]")
             else:
-                console.print("[yellow]Installation cancelled[/yellow]")
+                _console().print("[yellow]Installation cancelled[/yellow]")
 
         else:
             # Single selection mode using select
             selected = single_select(
-                sorted(extensions),
+                extensions,
                 title=f"Select {ext_type} to install",
                 default_index=0
             )
             if not selected:
-                console.print("[yellow]Cancelled[/yellow]")
+                _console().print("[yellow]Cancelled[/yellow]")
                 raise typer.Exit()
 
             # Choose installation level using select
@@ -704,56 +910,10 @@ def interactive():
             )
             if level == "user-level (~/.claude)":
                 project = None
-                console.print("[dim]Installing to user level (~/.claude)[/dim]")
+                _console().print("[dim]Installing to user level (~/.claude)[/dim]")
             else:
-                # Get available Claude projects
-                claude_projects = get_claude_projects()
-
-                # Build project choices
-                project_choices = []
-                if claude_projects:
-                    project_choices.append("--- Claude Projects ---")
-                    for name, _ in claude_projects:
-                        project_choices.append(f"  📁 {name}")
-                    project_choices.append("--- Other Locations ---")
-
-                project_choices.extend([
-                    "current directory (.)",
-                    "parent directory (..)",
-                    "enter custom path"
-                ])
-
-                project_choice = single_select(
-                    project_choices,
-                    title="Select project location",
-                    default_index=0 if not claude_projects else len(claude_projects) + 2
-                )
-
-                # Parse the selection
-                project = None  # Initialize to avoid UnboundLocalError
-                if project_choice.startswith("  📁 "):
-                    # It's a Claude project
-                    selected_name = project_choice[5:]  # Remove "  📁 " prefix
-                    # Find the matching project
-                    for name, path in claude_projects:
-                        if name == selected_name:
-                            project = path
-                            break
-                    if project is None:
-                        console.print(f"[red]Error: Could not find project '{selected_name}'[/red]")
-                        raise typer.Exit()
-                elif project_choice == "current directory (.)":
-                    project = Path(".")
-                elif project_choice == "parent directory (..)":
-                    project = Path("..")
-                elif project_choice in ["--- Claude Projects ---", "--- Other Locations ---"]:
-                    # User selected a separator, treat as cancelled
-                    console.print("[yellow]Installation cancelled[/yellow]")
-                    raise typer.Exit()
-                else:
-                    project = Path(Prompt.ask("Enter project path", default="."))
-
-                console.print(f"[dim]Installing to project: {project}[/dim]")
+                project = _prompt_project_location(project_cache, "Installation cancelled")
+                _console().print(f"[dim]Installing to project: {project}[/dim]")
 
             # Confirm using select
             confirm = single_select(
@@ -764,11 +924,10 @@ def interactive():
             if confirm == "Yes, proceed":
                 try:
                     install_extension(ext_type, selected, project)
-                    console.print(f"[green]✅ Successfully installed '{selected}'![/green]")
                 except typer.Exit:
                     pass  # Error already displayed
             else:
-                console.print("[yellow]Installation cancelled[/yellow]")
+                _console().print("[yellow]Installation cancelled[/yellow]")
 
     elif action == "uninstall":
         # Choose level first using select
@@ -780,73 +939,31 @@ def interactive():
         if level == "user-level (~/.claude)":
             project = None
         else:
-            # Get available Claude projects
-            claude_projects = get_claude_projects()
-
-            # Build project choices
-            project_choices = []
-            if claude_projects:
-                project_choices.append("--- Claude Projects ---")
-                for name, _ in claude_projects:
-                    project_choices.append(f"  📁 {name}")
-                project_choices.append("--- Other Locations ---")
-
-            project_choices.extend([
-                "current directory (.)",
-                "parent directory (..)",
-                "enter custom path"
-            ])
-
-            project_choice = single_select(
-                project_choices,
-                title="Select project location",
-                default_index=0 if not claude_projects else len(claude_projects) + 2
-            )
-
-            # Parse the selection
-            project = None  # Initialize to avoid UnboundLocalError
-            if project_choice.startswith("  📁 "):
-                # It's a Claude project
-                selected_name = project_choice[5:]  # Remove "  📁 " prefix
-                # Find the matching project
-                for name, path in claude_projects:
-                    if name == selected_name:
-                        project = path
-                        break
-                if project is None:
-                    console.print(f"[red]Error: Could not find project '{selected_name}'[/red]")
-                    raise typer.Exit()
-            elif project_choice == "current directory (.)":
-                project = Path(".")
-            elif project_choice == "parent directory (..)":
-                project = Path("..")
-            elif project_choice in ["--- Claude Projects ---", "--- Other Locations ---"]:
-                # User selected a separator, treat as cancelled
-                console.print("[yellow]Operation cancelled[/yellow]")
-                raise typer.Exit()
-            else:
-                project = Path(Prompt.ask("Enter project path", default="."))
+            project = _prompt_project_location(project_cache, "Operation cancelled")
 
         # Show installed extensions
         installed = list_installed(ext_type, project)
         if not installed:
             level = "user" if project is None else "project"
-            console.print(f"[yellow]No {ext_type}s installed at {level} level[/yellow]")
+            _console().print(f"[yellow]No {ext_type}s installed at {level} level[/yellow]")
             raise typer.Exit()
 
-        console.print(f"\n[bold]Installed {ext_type.capitalize()}s:[/bold]")
-        for i, (name, location) in enumerate(installed, 1):
-            console.print(f"  {i}. [green]{name}[/green]")
+        installed_names = []
+        lines = []
+        for i, (name, _) in enumerate(installed, 1):
+            installed_names.append(name)
+            lines.append(f"  {i}. [green]{name}[/green]")
+        _console().print(f"\n[bold]Installed {ext_type.capitalize()}s:[/bold]")
+        _console().print("\n".join(lines))
 
         # Select extension to uninstall using select
-        installed_names = [name for name, _ in installed]
         selected = single_select(
             installed_names,
             title="Select extension to uninstall",
             default_index=0
         )
         if not selected:
-            console.print("[yellow]Cancelled[/yellow]")
+            _console().print("[yellow]Cancelled[/yellow]")
             raise typer.Exit()
 
         # Confirm using select
@@ -858,11 +975,10 @@ def interactive():
         if confirm == "Yes, uninstall":
             try:
                 uninstall_extension(ext_type, selected, project)
-                console.print(f"[green]✅ Successfully uninstalled '{selected}'![/green]")
             except typer.Exit:
                 pass  # Error already displayed
         else:
-            console.print("[yellow]Uninstall cancelled[/yellow]")
+            _console().print("[yellow]Uninstall cancelled[/yellow]")
 
     # Ask if user wants to continue using select
     continue_choice = single_select(
@@ -870,8 +986,19 @@ def interactive():
         title="Continue with another operation?",
         default_index=0
     )
-    if continue_choice == "Yes, continue":
-        interactive()  # Recursive call to continue
+    return continue_choice == "Yes, continue"
+
+
+# Whether questionary can drive this terminal: None until first tried, then
+# False for the rest of the session once it has failed
+_QUESTIONARY_OK: Optional[bool] = None
+
+
+def _questionary_unavailable(error: Exception) -> None:
+    """Switch the selectors to their numbered fallbacks, saying why once."""
+    global _QUESTIONARY_OK
+    _QUESTIONARY_OK = False
+    _console().print(f"[dim]questionary unavailable: {error}[/dim]")
 
 
 def single_select(
@@ -880,19 +1007,27 @@ def single_select(
     default_index: int = 0
 ) -> str:
     """Interactive single-select using questionary for better arrow key support."""
-    try:
-        # Use questionary for better terminal compatibility
-        result = questionary.select(
-            title,
-            choices=items,
-            default=items[default_index] if items else None
-        ).ask()
-        return result if result else ""
-    except (KeyboardInterrupt, EOFError):
-        return ""
-    except:
-        # Fallback to numbered selection if questionary fails
-        return _single_select_numbered(items, title, default_index)
+    global _QUESTIONARY_OK
+
+    if _QUESTIONARY_OK is not False:
+        try:
+            import questionary
+
+            # Use questionary for better terminal compatibility
+            result = questionary.select(
+                title,
+                choices=items,
+                default=items[default_index] if items else None
+            ).ask()
+            _QUESTIONARY_OK = True
+            return result if result else ""
+        except (KeyboardInterrupt, EOFError):
+            return ""
+        except Exception as e:
+            _questionary_unavailable(e)
+
+    # Fallback to numbered selection if questionary fails
+    return _single_select_numbered(items, title, default_index)
 
 
 # Removed _single_select_interactive as we're using questionary now
@@ -904,19 +1039,21 @@ def _single_select_numbered(
     default_index: int = 0
 ) -> str:
     """Fallback single-select using numbered choices."""
-    console.print(f"[bold cyan]{title}[/bold cyan]\n")
+    _console().print(f"[bold cyan]{title}[/bold cyan]\n")
 
     # Display items with numbers
-    for i, item in enumerate(items, 1):
-        if i - 1 == default_index:
-            console.print(f"  {i}. [green]{item} (default)[/green]")
-        else:
-            console.print(f"  {i}. {item}")
+    _console().print("\n".join(
+        f"  {i}. [green]{item} (default)[/green]" if i - 1 == default_index else f"  {i}. {item}"
+        for i, item in enumerate(items, 1)
+    ))
 
-    console.print("\n[dim]Enter number to select, or press ENTER for default[/dim]")
+    _console().print("\n[dim]Enter number to select, or press ENTER for default[/dim]")
 
+    # Plain input() for the prompt itself; it needs no markup and this is
+    # the path taken when the richer prompt libraries are unavailable
+    default = str(default_index + 1)
     while True:
-        choice = Prompt.ask("Selection", default=str(default_index + 1)).strip()
+        choice = input(f"Selection ({default}): ").strip() or default
 
         if choice.lower() == 'q':  # Quit
             return ""
@@ -926,9 +1063,9 @@ def _single_select_numbered(
             if 0 <= idx < len(items):
                 return items[idx]
             else:
-                console.print("[red]Invalid selection[/red]")
+                _console().print("[red]Invalid selection[/red]")
         except ValueError:
-            console.print("[red]Please enter a number[/red]")
+            _console().print("[red]Please enter a number[/red]")
 
 
 def multi_select(
@@ -937,18 +1074,26 @@ def multi_select(
     instructions: str = "Use arrow keys to navigate, space to select"
 ) -> List[str]:
     """Interactive multi-select using questionary for better arrow key support."""
-    try:
-        # Use questionary for better terminal compatibility
-        result = questionary.checkbox(
-            title,
-            choices=items
-        ).ask()
-        return result if result else []
-    except (KeyboardInterrupt, EOFError):
-        return []
-    except:
-        # Fallback to numbered selection if questionary fails
-        return _multi_select_numbered(items, title)
+    global _QUESTIONARY_OK
+
+    if _QUESTIONARY_OK is not False:
+        try:
+            import questionary
+
+            # Use questionary for better terminal compatibility
+            result = questionary.checkbox(
+                title,
+                choices=items
+            ).ask()
+            _QUESTIONARY_OK = True
+            return result if result else []
+        except (KeyboardInterrupt, EOFError):
+            return []
+        except Exception as e:
+            _questionary_unavailable(e)
+
+    # Fallback to numbered selection if questionary fails
+    return _multi_select_numbered(items, title)
 
 
 # Removed _multi_select_interactive as we're using questionary now
@@ -959,52 +1104,100 @@ def _multi_select_numbered(
     title: str
 ) -> List[str]:
     """Fallback multi-select using numbered choices."""
-    selected = set()
+    console = _console()
+    instructions = "[dim]Enter numbers (space-separated) to toggle, 'a' for all, 'n' for none, 'c' to confirm, 'q' to quit[/dim]"
+    # Every row in both states, formatted once up front
+    rows_off = [f"  {i:2}. [ ] {item}" for i, item in enumerate(items, 1)]
+    rows_on = [f"  {i:2}. [green][✓][/green] {item}" for i, item in enumerate(items, 1)]
+    # One flag per item, by index, so duplicates stay distinct
+    selected = bytearray(len(items))
+    drawn = None  # selection currently shown on screen
 
     while True:
-        console.clear()
-        console.print(f"[bold cyan]{title}[/bold cyan]\n")
-
-        # Display items with numbers
-        for i, item in enumerate(items, 1):
-            prefix = "[✓]" if item in selected else "[ ]"
-            if item in selected:
-                console.print(f"  {i:2}. [green]{prefix}[/green] {item}")
-            else:
-                console.print(f"  {i:2}. {prefix} {item}")
+        # Only reached when questionary cannot drive the terminal, so keep to
+        # a plain clear-and-reprint; redraw only once the selection changes
+        if selected != drawn:
+            console.clear()
+            console.print(f"[bold cyan]{title}[/bold cyan]\n")
+
+            # Display items with numbers
+            console.print("\n".join(
+                rows_on[i] if selected[i] else rows_off[i] for i in range(len(items))
+            ))
 
-        # Display selected count
-        if selected:
-            console.print(f"\n[green]Selected: {len(selected)} item(s)[/green]")
+            # Display selected count
+            count = selected.count(1)
+            if count:
+                console.print(f"\n[green]Selected: {count} item(s)[/green]")
 
-        console.print("\n[dim]Enter numbers (space-separated) to toggle, 'a' for all, 'n' for none, 'c' to confirm, 'q' to quit[/dim]")
+            console.print(f"\n{instructions}")
+            drawn = bytes(selected)
 
-        choice = Prompt.ask("Selection").strip().lower()
+        choice = input("Selection: ").strip().lower()
 
         if choice == 'c':  # Confirm
             break
         elif choice == 'q':  # Quit
-            selected = set()
-            break
+            return []
         elif choice == 'a':  # Select all
-            selected = set(items)
+            selected = bytearray(b"\x01" * len(items))
         elif choice == 'n':  # Select none
-            selected.clear()
+            selected = bytearray(len(items))
         else:
             # Parse numbers
             try:
                 numbers = [int(x) for x in choice.split()]
                 for num in numbers:
                     if 1 <= num <= len(items):
-                        item = items[num - 1]
-                        if item in selected:
-                            selected.remove(item)
-                        else:
-                            selected.add(item)
+                        selected[num - 1] ^= 1
             except (ValueError, IndexError):
                 pass  # Ignore invalid input
 
-    return list(selected)
+    return [item for item, flag in zip(items, selected) if flag]
+
+
+def _install_one(
+    source_dir: Path,
+    target_dir: Path,
+    name: str,
+    force: bool,
+    dir_fd: Optional[int] = None
+) -> Tuple[str, bool, str]:
+    """Copy one extension for install_multiple_extensions.
+
+    ``dir_fd``, if given, is target_dir opened as a directory.
+
+    Returns:
+        Tuple of (name, succeeded, status line to print)
+    """
+    try:
+        # Source path - look for .md file; opening it is the existence check
+        source_file = source_dir / f"{name}.md"
+
+        try:
+            src = open(source_file, "rb")
+        except FileNotFoundError:
+            return name, False, f"  [red]❌ {name}: Not found[/red]"
+
+        with src:
+            # Target path - also .md file
+            target_name = f"{name}.md"
+
+            # Copy file; without force the target is created exclusively, so
+            # the open itself reports an existing install, as in
+            # install_extension
+            try:
+                if dir_fd is None:
+                    _copy_extension(src, target_dir / target_name, exclusive=not force)
+                else:
+                    _copy_extension(src, target_name, dir_fd, exclusive=not force)
+            except FileExistsError:
+                return name, False, f"  [yellow]⚠️  {name}: Already installed (use --force to overwrite)[/yellow]"
+
+        return name, True, f"  [green]✅ {name}: Installed successfully[/green]"
+
+    except Exception as e:
+        return name, False, f"  [red]❌ {name}: Failed - {str(e)}[/red]"
 
 
 def install_multiple_extensions(
@@ -1021,81 +1214,158 @@ def install_multiple_extensions(
     successful = []
     failed = []
 
-    console.print(f"\n[bold]Installing {len(names)} {ext_type}(s)...[/bold]\n")
+    # A repeated name would copy onto one target from two threads
+    names = list(dict.fromkeys(names))
 
-    for name in names:
-        try:
-            # Source path - look for .md file
-            extensions_dir = get_extensions_dir()
-            source_file = extensions_dir / f"{ext_type}s" / f"{name}.md"
+    _console().print(f"\n[bold]Installing {len(names)} {ext_type}(s)...[/bold]\n")
 
-            if not source_file.exists():
-                console.print(f"  [red]❌ {name}: Not found[/red]")
-                failed.append(name)
-                continue
+    # Every file in the batch shares the same source and target directories
+    source_dir = get_extensions_dir() / _TYPE_DIR[ext_type]
+    target_dir = get_claude_dir(project_path) / _TYPE_DIR[ext_type]
+    dir_fd = None
+    try:
+        target_dir.mkdir(parents=True, exist_ok=True)
 
-            # Target path - also .md file
-            claude_dir = get_claude_dir(project_path)
-            target_file = claude_dir / f"{ext_type}s" / f"{name}.md"
+        # Open the target directory once so each copy opens its file relative
+        # to it (openat) rather than walking the whole path again
+        if os.open in os.supports_dir_fd:
+            dir_fd = os.open(target_dir, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError as e:
+        # Nothing can be installed without the target directory
+        _console().print("\n".join(f"  [red]❌ {name}: Failed - {str(e)}[/red]" for name in names))
+        return successful, list(names)
 
-            # Check if already exists
-            if target_file.exists() and not force:
-                console.print(f"  [yellow]⚠️  {name}: Already installed (use --force to overwrite)[/yellow]")
-                failed.append(name)
-                continue
+    def install(name: str) -> Tuple[str, bool, str]:
+        return _install_one(source_dir, target_dir, name, force, dir_fd)
 
-            # Create directory structure
-            target_file.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if len(names) > 1:
+            # Copies are I/O bound and release the GIL, so overlap them; results
+            # still come back (and are reported) in input order.
+            from concurrent.futures import ThreadPoolExecutor
 
-            # Copy file
-            shutil.copy2(source_file, target_file)
+            with ThreadPoolExecutor(max_workers=min(8, len(names))) as pool:
+                results = list(pool.map(install, names))
+        else:
+            results = [install(name) for name in names]
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
 
-            console.print(f"  [green]✅ {name}: Installed successfully[/green]")
-            successful.append(name)
+    _installed_cache.clear()
 
-        except Exception as e:
-            console.print(f"  [red]❌ {name}: Failed - {str(e)}[/red]")
+    for name, ok, message in results:
+        if ok:
+            successful.append(name)
+        else:
             failed.append(name)
 
+    # One markup parse and write for the whole batch
+    _console().print("\n".join(message for _, _, message in results))
+
     return successful, failed
 
 
-@app.callback(invoke_without_command=True)
-def main(
-    ctx: typer.Context,
-    version: bool = typer.Option(False, "--version", "-v", help="Show version"),
-    help: bool = typer.Option(False, "--help", "-h", help="Show help"),
-):
-    """Claude Code Extensions Manager"""
-    if version:
-        print(f"[cyan]claude-ext[/cyan] version [green]{__version__}[/green]")
-        raise typer.Exit()
+HELP_TEXT = """\
+[cyan]Claude Code Extensions Manager[/cyan]
 
-    if help and ctx.invoked_subcommand is None:
-        # Show help if explicitly requested
-        print("[cyan]Claude Code Extensions Manager[/cyan]")
-        print("\nUsage: claude-ext [agent|command|interactive] [OPTIONS]")
-        print("\nCommands:")
-        print("  agent         Manage Claude Code agents")
-        print("  command       Manage Claude Code commands")
-        print("  interactive   Interactive mode (guided)")
-        print("  list-projects List available Claude projects")
-        print("\nExamples:")
-        print("  claude-ext                                      # Start interactive mode (default)")
-        print("  claude-ext interactive                         # Start interactive mode")
-        print("  claude-ext list-projects                       # List available Claude projects")
-        print("  claude-ext agent list")
-        print("  claude-ext agent install security-scanner")
-        print("  claude-ext agent install scanner analyzer -f   # Install multiple")
-        print("  claude-ext command install -i                  # Interactive multi-select")
-        print("  claude-ext command install smart-commit --project ~/my-project")
-        print("\nRun 'claude-ext [COMMAND] --help' for more information")
-        raise typer.Exit()
+Usage: claude-ext \\[agent|command|interactive] [OPTIONS]
+
+Commands:
+  agent         Manage Claude Code agents
+  command       Manage Claude Code commands
+  interactive   Interactive mode (guided)
+  list-projects List available Claude projects
+
+Examples:
+  claude-ext                                      # Start interactive mode (default)
+  claude-ext interactive                         # Start interactive mode
+  claude-ext list-projects                       # List available Claude projects
+  claude-ext agent list
+  claude-ext agent install security-scanner
+  claude-ext agent install scanner analyzer -f   # Install multiple
+  claude-ext command install -i                  # Interactive multi-select
+  claude-ext command install smart-commit --project ~/my-project
+
+Run 'claude-ext [COMMAND] --help' for more information"""
+
+VERSION_TEXT = f"claude-ext version {__version__}\n"
+
+
+def _print_help() -> None:
+    """Print the top-level help text."""
+    _console().print(HELP_TEXT)
+
+
+def _build_app() -> "typer.Typer":
+    """Create the Typer app and register the top-level commands."""
+    import typer
+
+    app = typer.Typer(
+        name="claude-ext",
+        help="Manage Claude Code extensions",
+        add_completion=False,
+    )
+
+    @app.callback(invoke_without_command=True)
+    def main(
+        ctx: typer.Context,
+        version: bool = typer.Option(False, "--version", "-v", help="Show version"),
+        help: bool = typer.Option(False, "--help", "-h", help="Show help"),
+    ):
+        """Claude Code Extensions Manager"""
+        if version:
+            sys.stdout.write(VERSION_TEXT)
+            raise typer.Exit()
+
+        if help and ctx.invoked_subcommand is None:
+            # Show help if explicitly requested
+            _print_help()
+            raise typer.Exit()
+
+        if ctx.invoked_subcommand is None:
+            # Default to interactive mode if no command given
+            interactive()
+
+    app.command()(list_projects)
+    app.command()(interactive)
+    return app
+
+
+def _register_subcommands(app: "typer.Typer", args: List[str]) -> None:
+    """Attach the agent/command sub-apps needed for this invocation.
+
+    Typer builds a click parser for every registered sub-app, so sniff the
+    first non-option argument and register only the matching one. Help and
+    unknown commands get every sub-app so they are still listed.
+    """
+    name = next((arg for arg in args if not arg.startswith("-")), None)
+
+    if name in EXTENSION_TYPES:
+        app.add_typer(_make_ext_cli(name), name=name)
+    elif name not in ("interactive", "list-projects"):
+        for ext_type in EXTENSION_TYPES:
+            app.add_typer(_make_ext_cli(ext_type), name=ext_type)
+
+
+def cli() -> None:
+    """Entry point for the claude-ext script.
+
+    A bare --version or --help is answered before Typer (and Click) are
+    imported; everything else goes through the full app.
+    """
+    args = sys.argv[1:]
+    if args in (["-v"], ["--version"]):
+        sys.stdout.write(VERSION_TEXT)
+        return
+    if args in (["-h"], ["--help"]):
+        _print_help()
+        return
 
-    if ctx.invoked_subcommand is None:
-        # Default to interactive mode if no command given
-        interactive()
+    app = _build_app()
+    _register_subcommands(app, args)
+    app()
 
 
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    cli()
\ No newline at end of file
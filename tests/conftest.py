@@ -1,36 +1,20 @@
 """Pytest configuration and fixtures."""
 
+import os
 import shutil
 import tempfile
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING
 
 import pytest
 
-from claude_extensions.models import Extension, ExtensionType
+if TYPE_CHECKING:
+    from claude_extensions.installer.core import ExtensionInstaller
+    from claude_extensions.models import Extension
 
-
-@pytest.fixture
-def temp_dir() -> Generator[Path, None, None]:
-    """Create a temporary directory for testing."""
-    temp_path = Path(tempfile.mkdtemp())
-    yield temp_path
-    shutil.rmtree(temp_path, ignore_errors=True)
-
-
-@pytest.fixture
-def mock_extensions_dir(temp_dir: Path) -> Path:
-    """Create a mock extensions directory with sample files."""
-    extensions_dir = temp_dir / "extensions"
-    commands_dir = extensions_dir / "commands"
-    agents_dir = extensions_dir / "agents"
-
-    commands_dir.mkdir(parents=True)
-    agents_dir.mkdir(parents=True)
-
-    # Create sample command file
-    command_file = commands_dir / "test-command.md"
-    command_file.write_text("""---
+# Sample extension bodies, kept as bytes so they are encoded once at import
+# rather than on every mock_extensions_dir call.
+_COMMAND_MD = b"""---
 description: "Test command for unit tests"
 allowed-tools: ["Read", "Write"]
 ---
@@ -38,11 +22,9 @@ allowed-tools: ["Read", "Write"]
 # Test Command
 
 This is a test command.
-""")
+"""
 
-    # Create sample agent file
-    agent_file = agents_dir / "test-agent.md"
-    agent_file.write_text("""---
+_AGENT_MD = b"""---
 description: "Test agent for unit tests"
 model: "claude-3"
 ---
@@ -50,29 +32,116 @@ model: "claude-3"
 # Test Agent
 
 This is a test agent.
-""")
+"""
 
-    return extensions_dir
+
+def pytest_configure(config):
+    """Put pytest's temp directories on tmpfs when one is available.
+
+    Fixture setup is dominated by mkdir/write calls, which are much cheaper on
+    /dev/shm than on a disk-backed or overlay filesystem. Only pytest's base
+    temp directory moves; TMPDIR is left alone for the code under test, and an
+    explicit --basetemp (or TMPDIR) still wins. xdist workers inherit the
+    controller's base temp, so they skip this.
+    """
+    if (
+        config.option.basetemp is None
+        and "TMPDIR" not in os.environ
+        and os.access("/dev/shm", os.W_OK)
+    ):
+        basetemp = tempfile.mkdtemp(prefix="pytest-", dir="/dev/shm")
+        config.option.basetemp = basetemp
+        # tmpfs is memory; do not leave a directory behind on every run
+        config.add_cleanup(lambda: shutil.rmtree(basetemp, ignore_errors=True))
 
 
 @pytest.fixture
-def sample_extension() -> Extension:
-    """Create a sample Extension object."""
+def temp_dir(tmp_path: Path) -> Path:
+    """Create a temporary directory for testing."""
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def mock_extensions_dir(tmp_path_factory) -> Path:
+    """Create a mock extensions directory with sample files.
+
+    Built once per session and shared, so tests must treat it as read-only;
+    copy it with ``shutil.copytree`` before modifying it.
+    """
+    extensions_dir = tmp_path_factory.mktemp("ext", numbered=False) / "extensions"
+    commands_dir = extensions_dir / "commands"
+    agents_dir = extensions_dir / "agents"
+
+    extensions_dir.mkdir()
+    commands_dir.mkdir()
+    agents_dir.mkdir()
+
+    # Create sample command and agent files
+    (commands_dir / "test-command.md").write_bytes(_COMMAND_MD)
+    (agents_dir / "test-agent.md").write_bytes(_AGENT_MD)
+
+    return extensions_dir
+
+
+@pytest.fixture(scope="session")
+def sample_extension(tmp_path_factory) -> "Extension":
+    """Create a sample Extension object, shared read-only across the session.
+
+    Its source path lives under the session's temp root rather than a fixed
+    /tmp name, so parallel workers (pytest-xdist) never write the same file.
+    """
+    from claude_extensions.models import Extension, ExtensionType
+
     return Extension(
         name="test-extension",
         type=ExtensionType.COMMAND,
-        path=Path("/tmp/test-extension.md"),
+        path=tmp_path_factory.mktemp("src") / "test-extension.md",
         description="A test extension",
         metadata={"allowed-tools": ["Read", "Write"]}
     )
 
 
 @pytest.fixture
-def mock_home_dir(temp_dir: Path, monkeypatch) -> Path:
-    """Mock the home directory for testing user-level installations."""
+def installer(mock_home_dir: Path, monkeypatch) -> "ExtensionInstaller":
+    """Create an ExtensionInstaller without walking the extensions directory.
+
+    find_extensions is replaced with an empty result, since the tests assign
+    ``installer.extensions`` themselves. The installer is built per test, after
+    mock_home_dir, so any paths it derives from HOME point at the mock home.
+    """
+    from claude_extensions.installer.core import ExtensionInstaller
+
+    monkeypatch.setattr(
+        "claude_extensions.installer.core.find_extensions", lambda *args, **kwargs: []
+    )
+    return ExtensionInstaller()
+
+
+@pytest.fixture(scope="session")
+def _claude_skeleton(tmp_path_factory) -> Path:
+    """Create an empty ``.claude/commands`` and ``.claude/agents`` tree once.
+
+    Treat it as read-only; mock_home_dir copies it for each test.
+    """
+    base = tmp_path_factory.mktemp("skel")
+    (base / ".claude" / "commands").mkdir(parents=True)
+    (base / ".claude" / "agents").mkdir(parents=True)
+    return base
+
+
+@pytest.fixture
+def mock_home_dir(temp_dir: Path, _claude_skeleton: Path, monkeypatch) -> Path:
+    """Mock the home directory for testing user-level installations.
+
+    The home directory starts as a copy of _claude_skeleton, so its
+    ``.claude/commands`` and ``.claude/agents`` directories already exist.
+    """
     home_dir = temp_dir / "home"
-    home_dir.mkdir()
-    monkeypatch.setattr(Path, "home", lambda: home_dir)
+    shutil.copytree(_claude_skeleton, home_dir)
+    # Path.home() reads HOME (USERPROFILE on Windows), so swapping the
+    # environment is enough; no class attribute needs patching.
+    monkeypatch.setenv("HOME", str(home_dir))
+    monkeypatch.setenv("USERPROFILE", str(home_dir))
     return home_dir
 
 
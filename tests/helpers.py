@@ -0,0 +1,29 @@
+"""Shared helpers for building test file trees."""
+
+import os
+from pathlib import Path
+from typing import Dict
+
+
+def write_tree(root: Path, tree: Dict[str, bytes]) -> None:
+    """Write ``tree`` (relative path -> contents) below ``root``.
+
+    Each distinct parent directory is created once, and files are written
+    with a bare os.open/os.write/os.close rather than Path.write_text.
+    """
+    made = set()
+    for rel_path, data in tree.items():
+        path = os.path.join(root, rel_path)
+        parent = os.path.dirname(path)
+        if parent not in made:
+            os.makedirs(parent, exist_ok=True)
+            made.add(parent)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                # os.write may write fewer bytes than asked for
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
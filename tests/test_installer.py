@@ -1,5 +1,6 @@
 """Tests for the installer core module."""
 
+import shutil
 from pathlib import Path
 from unittest.mock import patch
 
@@ -7,6 +8,7 @@ import pytest
 
 from claude_extensions.installer.core import ExtensionInstaller
 from claude_extensions.models import Extension, ExtensionType, InstallLevel
+from tests.helpers import write_tree
 
 
 class TestExtensionInstaller:
@@ -20,21 +22,19 @@ class TestExtensionInstaller:
             assert installer.extensions == []
             mock_find.assert_called_once()
 
-    def test_get_extensions_no_filter(self, sample_extension):
+    def test_get_extensions_no_filter(self, sample_extension, installer):
         """Test getting all extensions without filter."""
-        installer = ExtensionInstaller()
         installer.extensions = [sample_extension]
 
         result = installer.get_extensions()
         assert len(result) == 1
         assert result[0] == sample_extension
 
-    def test_get_extensions_with_filter(self):
+    def test_get_extensions_with_filter(self, installer):
         """Test getting extensions with type filter."""
         cmd_ext = Extension("cmd", ExtensionType.COMMAND, Path("/tmp/cmd.md"))
         agent_ext = Extension("agent", ExtensionType.AGENT, Path("/tmp/agent.md"))
 
-        installer = ExtensionInstaller()
         installer.extensions = [cmd_ext, agent_ext]
 
         commands = installer.get_extensions(ExtensionType.COMMAND)
@@ -45,13 +45,11 @@ class TestExtensionInstaller:
         assert len(agents) == 1
         assert agents[0].name == "agent"
 
-    def test_install_extension_user_level(self, sample_extension, mock_home_dir):
+    def test_install_extension_user_level(self, sample_extension, mock_home_dir, installer):
         """Test installing extension at user level."""
-        installer = ExtensionInstaller()
-
         # Create the source file
         sample_extension.path.parent.mkdir(parents=True, exist_ok=True)
-        sample_extension.path.write_text("test content")
+        sample_extension.path.write_bytes(b"test content")
 
         success, message = installer.install_extension(
             sample_extension,
@@ -64,17 +62,16 @@ class TestExtensionInstaller:
         # Check file was copied
         expected_path = mock_home_dir / ".claude" / "commands" / sample_extension.filename
         assert expected_path.exists()
-        assert expected_path.read_text() == "test content"
+        assert expected_path.read_bytes() == b"test content"
 
-    def test_install_extension_project_level(self, sample_extension, temp_dir):
+    def test_install_extension_project_level(self, sample_extension, temp_dir, installer):
         """Test installing extension at project level."""
-        installer = ExtensionInstaller()
         project_path = temp_dir / "project"
         project_path.mkdir()
 
         # Create the source file
         sample_extension.path.parent.mkdir(parents=True, exist_ok=True)
-        sample_extension.path.write_text("test content")
+        sample_extension.path.write_bytes(b"test content")
 
         success, message = installer.install_extension(
             sample_extension,
@@ -89,10 +86,8 @@ class TestExtensionInstaller:
         expected_path = project_path / ".claude" / "commands" / sample_extension.filename
         assert expected_path.exists()
 
-    def test_install_extension_project_without_path(self, sample_extension):
+    def test_install_extension_project_without_path(self, sample_extension, installer):
         """Test that project installation requires path."""
-        installer = ExtensionInstaller()
-
         success, message = installer.install_extension(
             sample_extension,
             InstallLevel.PROJECT
@@ -101,17 +96,27 @@ class TestExtensionInstaller:
         assert success is False
         assert "Project path required" in message
 
-    def test_install_multiple(self, temp_dir, mock_home_dir):
+    def test_install_creates_missing_dirs(self, sample_extension, mock_home_dir, installer):
+        """Test that installing creates .claude/commands when it is missing."""
+        # mock_home_dir starts with the .claude skeleton; remove it
+        shutil.rmtree(mock_home_dir / ".claude")
+        sample_extension.path.parent.mkdir(parents=True, exist_ok=True)
+        sample_extension.path.write_bytes(b"test content")
+
+        success, _ = installer.install_extension(sample_extension, InstallLevel.USER)
+
+        assert success is True
+        assert (mock_home_dir / ".claude" / "commands" / sample_extension.filename).exists()
+
+    def test_install_multiple(self, temp_dir, mock_home_dir, installer):
         """Test installing multiple extensions."""
         # Create two extensions
         ext1 = Extension("ext1", ExtensionType.COMMAND, temp_dir / "ext1.md")
         ext2 = Extension("ext2", ExtensionType.AGENT, temp_dir / "ext2.md")
 
         # Create source files
-        ext1.path.write_text("content1")
-        ext2.path.write_text("content2")
+        write_tree(temp_dir, {"ext1.md": b"content1", "ext2.md": b"content2"})
 
-        installer = ExtensionInstaller()
         success_count, errors = installer.install_multiple(
             [ext1, ext2],
             InstallLevel.USER
@@ -126,15 +131,13 @@ class TestExtensionInstaller:
         assert cmd_path.exists()
         assert agent_path.exists()
 
-    def test_uninstall_extension(self, sample_extension, mock_home_dir):
+    def test_uninstall_extension(self, sample_extension, mock_home_dir, installer):
         """Test uninstalling an extension."""
-        installer = ExtensionInstaller()
         installer.extensions = [sample_extension]
 
         # Install first
         install_path = mock_home_dir / ".claude" / "commands" / sample_extension.filename
-        install_path.parent.mkdir(parents=True, exist_ok=True)
-        install_path.write_text("content")
+        write_tree(mock_home_dir / ".claude", {f"commands/{sample_extension.filename}": b"content"})
 
         # Uninstall
         success, message = installer.uninstall_extension(
@@ -146,9 +149,8 @@ class TestExtensionInstaller:
         assert "Uninstalled" in message
         assert not install_path.exists()
 
-    def test_uninstall_nonexistent(self):
+    def test_uninstall_nonexistent(self, installer):
         """Test uninstalling extension that doesn't exist."""
-        installer = ExtensionInstaller()
         installer.extensions = []
 
         success, message = installer.uninstall_extension(
@@ -159,19 +161,14 @@ class TestExtensionInstaller:
         assert success is False
         assert "not found" in message
 
-    def test_list_installed(self, mock_home_dir):
+    def test_list_installed(self, mock_home_dir, installer):
         """Test listing installed extensions."""
-        installer = ExtensionInstaller()
-
         # Create some installed files
-        commands_dir = mock_home_dir / ".claude" / "commands"
-        agents_dir = mock_home_dir / ".claude" / "agents"
-        commands_dir.mkdir(parents=True)
-        agents_dir.mkdir(parents=True)
-
-        (commands_dir / "cmd1.md").write_text("content")
-        (commands_dir / "cmd2.md").write_text("content")
-        (agents_dir / "agent1.md").write_text("content")
+        write_tree(mock_home_dir / ".claude", {
+            "commands/cmd1.md": b"content",
+            "commands/cmd2.md": b"content",
+            "agents/agent1.md": b"content",
+        })
 
         installed = installer.list_installed(InstallLevel.USER)
 
@@ -0,0 +1,176 @@
+"""Tests for the main CLI module."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import main
+from tests.helpers import write_tree
+
+
+def _dir_entry(parent: Path, name: str) -> os.DirEntry:
+    """Return the os.DirEntry for ``name`` inside ``parent``."""
+    with os.scandir(parent) as entries:
+        return next(entry for entry in entries if entry.name == name)
+
+
+class TestResolveEncoded:
+    """Test matching encoded path parts against real directories."""
+
+    def test_resolves_non_alphanumeric_names(self, temp_dir):
+        """Test that dots, underscores and spaces in names all match "-"."""
+        target = temp_dir / "code" / "my_app.v2" / "src tree"
+        target.mkdir(parents=True)
+
+        parts = ["code", "my", "app", "v2", "src", "tree"]
+        found = main._resolve_encoded(str(temp_dir), parts, {})
+
+        assert found == str(target)
+
+    def test_backtracks_from_dead_end(self, temp_dir):
+        """Test that a longer match without the rest falls back to a shorter one."""
+        (temp_dir / "my-app").mkdir()
+        (temp_dir / "my" / "app" / "inner").mkdir(parents=True)
+
+        found = main._resolve_encoded(str(temp_dir), ["my", "app", "inner"], {})
+
+        assert found == str(temp_dir / "my" / "app" / "inner")
+
+    def test_missing_path(self, temp_dir):
+        """Test that an unmatched part gives None and each listing is cached."""
+        (temp_dir / "code").mkdir()
+        listings = {}
+
+        found = main._resolve_encoded(str(temp_dir), ["code", "nope"], listings)
+
+        assert found is None
+        assert set(listings) == {str(temp_dir), str(temp_dir / "code")}
+
+
+class TestSessionCwd:
+    """Test reading a project's path from its session logs."""
+
+    def test_reads_cwd_from_newest_session(self, temp_dir):
+        """Test that the newest session's matching cwd is returned."""
+        cwd = "/Users/tester/code/my_app.v2"
+        encoded = main._NON_ALNUM.sub("-", cwd)
+        write_tree(temp_dir, {
+            f"{encoded}/old.jsonl": json.dumps({"cwd": "/Users/tester/old"}).encode() + b"\n",
+            f"{encoded}/new.jsonl": (
+                json.dumps({"type": "summary"}).encode() + b"\n"
+                # A later cd elsewhere does not encode back to the directory name
+                + json.dumps({"cwd": "/tmp"}).encode() + b"\n"
+                + json.dumps({"cwd": cwd}).encode() + b"\n"
+            ),
+        })
+        os.utime(temp_dir / encoded / "old.jsonl", ns=(1, 1))
+
+        assert main._session_cwd(_dir_entry(temp_dir, encoded)) == cwd
+
+    def test_reads_only_the_start_of_the_log(self, temp_dir):
+        """Test that a cwd past the first _SESSION_HEAD_BYTES is not searched for."""
+        cwd = "/Users/tester/code/app"
+        encoded = main._NON_ALNUM.sub("-", cwd)
+        padding = json.dumps({"text": "x" * main._SESSION_HEAD_BYTES}).encode()
+        write_tree(temp_dir, {
+            f"{encoded}/s.jsonl": padding + b"\n" + json.dumps({"cwd": cwd}).encode() + b"\n",
+        })
+
+        assert main._session_cwd(_dir_entry(temp_dir, encoded)) is None
+
+    def test_no_sessions(self, temp_dir):
+        """Test that a project directory without session logs gives None."""
+        (temp_dir / "-Users-tester-empty").mkdir()
+
+        assert main._session_cwd(_dir_entry(temp_dir, "-Users-tester-empty")) is None
+
+
+class TestCopyExtension:
+    """Test copying an opened extension file into place."""
+
+    def test_copies_bytes_and_mtime(self, temp_dir):
+        """Test that the data and the source's timestamps are copied."""
+        write_tree(temp_dir, {"src.md": b"# Agent\n" * 100})
+        os.utime(temp_dir / "src.md", ns=(1_000_000_000, 2_000_000_000))
+
+        with open(temp_dir / "src.md", "rb") as src:
+            main._copy_extension(src, temp_dir / "dst.md")
+
+        assert (temp_dir / "dst.md").read_bytes() == b"# Agent\n" * 100
+        assert os.stat(temp_dir / "dst.md").st_mtime_ns == 2_000_000_000
+
+    def test_falls_back_when_copy_file_range_fails(self, temp_dir, monkeypatch):
+        """Test that an OSError from copy_file_range falls back to a plain copy."""
+        def broken_copy_file_range(*args, **kwargs):
+            raise OSError("not supported")
+
+        monkeypatch.setattr(os, "copy_file_range", broken_copy_file_range, raising=False)
+        write_tree(temp_dir, {"src.md": b"content"})
+
+        with open(temp_dir / "src.md", "rb") as src:
+            main._copy_extension(src, temp_dir / "dst.md")
+
+        assert (temp_dir / "dst.md").read_bytes() == b"content"
+
+    def test_exclusive_keeps_existing_target(self, temp_dir):
+        """Test that an exclusive copy onto an existing file raises and leaves it alone."""
+        write_tree(temp_dir, {"src.md": b"new", "dst.md": b"old"})
+
+        with open(temp_dir / "src.md", "rb") as src:
+            with pytest.raises(FileExistsError):
+                main._copy_extension(src, temp_dir / "dst.md", exclusive=True)
+
+        assert (temp_dir / "dst.md").read_bytes() == b"old"
+
+
+class TestInstallMultiple:
+    """Test batch installs."""
+
+    def test_results_in_input_order(self, temp_dir, monkeypatch, capsys):
+        """Test that successes and failures are reported in input order."""
+        write_tree(temp_dir, {
+            "extensions/agents/a.md": b"a",
+            "extensions/agents/b.md": b"b",
+            "extensions/agents/c.md": b"c",
+            "project/.claude/agents/b.md": b"installed",
+        })
+        monkeypatch.setattr(main, "_EXTENSIONS_DIR", temp_dir / "extensions")
+        # A fresh plain console per call writes to capsys's stdout
+        monkeypatch.setattr(main, "_console", main._PlainConsole)
+
+        successful, failed = main.install_multiple_extensions(
+            "agent", ["c", "missing", "b", "a"], temp_dir / "project"
+        )
+
+        assert successful == ["c", "a"]
+        assert failed == ["missing", "b"]
+        lines = [line.strip() for line in capsys.readouterr().out.splitlines() if line.strip()]
+        assert lines[1:] == [
+            "✅ c: Installed successfully",
+            "❌ missing: Not found",
+            "⚠️  b: Already installed (use --force to overwrite)",
+            "✅ a: Installed successfully",
+        ]
+        assert (temp_dir / "project" / ".claude" / "agents" / "b.md").read_bytes() == b"installed"
+        assert (temp_dir / "project" / ".claude" / "agents" / "c.md").read_bytes() == b"c"
+
+
+class TestCli:
+    """Test the claude-ext entry point."""
+
+    def test_version_skips_typer(self):
+        """Test that --version is answered without importing typer."""
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, main; main.cli(); print('typer' in sys.modules)",
+             "--version"],
+            cwd=Path(main.__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert result.stdout == main.VERSION_TEXT + "False\n"